@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Convert and pre-quantize a Whisper model to CTranslate2 format on disk.
+
+server.py loads models/<name>-<quantization>/ when it exists instead of
+downloading from the HF hub and re-quantizing the weights on every boot.
+
+Requires the converter's extra dependencies (not needed by the server):
+    uv pip install transformers torch
+
+Usage:
+    uv run python prepare_model.py [model] [--quantization int8_float32]
+
+Examples:
+    uv run python prepare_model.py distil-large-v3
+    uv run python prepare_model.py distil-small.en --quantization int8
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+MODELS_DIR = Path(__file__).parent / "models"
+
+# server.py model names -> original Transformers checkpoints
+HF_MODELS = {
+    "distil-small.en": "distil-whisper/distil-small.en",
+    "distil-medium.en": "distil-whisper/distil-medium.en",
+    "distil-large-v3": "distil-whisper/distil-large-v3",
+    "tiny": "openai/whisper-tiny",
+    "base": "openai/whisper-base",
+    "small": "openai/whisper-small",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-quantize a Whisper model for the local server")
+    parser.add_argument("model", nargs="?", default="distil-large-v3", choices=sorted(HF_MODELS),
+                        help="Model name as used by server.py (default: distil-large-v3)")
+    parser.add_argument("--quantization", default="int8_float32",
+                        choices=["int8", "int8_float16", "int8_float32", "float16", "float32"],
+                        help="Weight type to store on disk (default: int8_float32)")
+    parser.add_argument("--force", action="store_true",
+                        help="Overwrite an existing output directory")
+    args = parser.parse_args()
+
+    output_dir = MODELS_DIR / f"{args.model}-{args.quantization}"
+    if output_dir.exists() and not args.force:
+        print(f"Already prepared: {output_dir} (use --force to rebuild)")
+        return
+
+    cmd = [
+        "ct2-transformers-converter",
+        "--model", HF_MODELS[args.model],
+        "--output_dir", str(output_dir),
+        "--quantization", args.quantization,
+        "--copy_files", "tokenizer.json", "preprocessor_config.json",
+    ]
+    if args.force:
+        cmd.append("--force")
+
+    print(f"Converting {HF_MODELS[args.model]} -> {output_dir}")
+    try:
+        subprocess.run(cmd, check=True)
+    except FileNotFoundError:
+        print("Error: ct2-transformers-converter not found (it ships with ctranslate2)")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: conversion failed (exit {e.returncode}); are transformers and torch installed?")
+        sys.exit(1)
+
+    print(f"Done. server.py will load {output_dir} for WHISPER_MODEL={args.model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,51 @@ Designed to run on NVIDIA MX330 (2GB VRAM) as a sidecar to the Go voice gateway.
 
 Endpoints:
     POST /transcribe  - Accept WAV body (PCM16/24kHz), return {"text": "...", "duration": ..., "model": "..."}
-    GET  /health      - Return {"status": "ready"|"loading", "model": "..."}
-    GET  /switch?model=base - Hot-swap model at runtime
+    POST /transcribe_path - Accept {"path": "/tmp/x.wav"} from localhost; the file is mmap'd instead of uploaded
+    GET  /health      - Return {"status": "ready"|"loading", "model": "...", "compute": "..."}
+    GET  /switch?model=base[&compute=int8] - Hot-swap model (and compute type) at runtime
+                       (409 while a model is still loading)
 
 Env vars:
-    WHISPER_MODEL   - Model name (default: distil-large-v3)
-    WHISPER_COMPUTE - Compute type (default: int8_float32)
+    WHISPER_MODEL   - Model name (default: distil-small.en, ~350MB VRAM at int8)
+    WHISPER_COMPUTE - Compute type (default: auto, CTranslate2 picks the fastest for the GPU)
     WHISPER_PORT    - Listen port (default: 8766)
+    WHISPER_QUEUE_SIZE - Max pending /transcribe requests before 503 (default: 8)
+    WHISPER_BATCH_SIZE - Max concurrent requests transcribed in one batch (default: 8)
+    WHISPER_BATCH_WAIT_MS - How long to wait for more requests to batch (default: 20)
+    WHISPER_BEAM_SIZE - Decoder beam size; 1 = greedy with temperature fallback (default: 1)
+    CUDA_CACHE_PATH - CUDA JIT kernel cache (default: ~/.cache/omarchy-voice-typing/cuda/<sm>-ct2-<ver>)
+
+Pre-quantized models:
+    `uv run python prepare_model.py distil-large-v3 --quantization int8_float32`
+    writes models/distil-large-v3-int8_float32/, which is loaded instead of the
+    HF hub download whenever WHISPER_COMPUTE matches (or is "auto"). This skips
+    re-quantizing the weights on every boot.
+
+Concurrency: HTTP requests are handled on their own threads, so /health and
+/switch never wait behind a transcription. Audio is decoded to 16kHz float32
+on the request thread, then queued (bounded) for a single inference worker
+that owns the GPU and batches requests arriving within WHISPER_BATCH_WAIT_MS.
 """
 
+import bisect
+import gc
 import io
 import json
+import mmap
 import os
+import queue
+import re
+import struct
+import subprocess
 import sys
 import threading
 import time
 import wave
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
@@ -41,75 +69,321 @@ if _nvidia_paths:
         os.environ["LD_LIBRARY_PATH"] = _new_path + (":" + _existing if _existing else "")
         os.execvp(sys.executable, [sys.executable] + sys.argv)
 
+# Native-library imports go after the LD_LIBRARY_PATH shim above
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from scipy.signal import resample_poly
 
-WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "base")
-WHISPER_COMPUTE = os.environ.get("WHISPER_COMPUTE", "int8_float32")
+
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "distil-small.en")
+WHISPER_COMPUTE = os.environ.get("WHISPER_COMPUTE", "auto")
 WHISPER_PORT = int(os.environ.get("WHISPER_PORT", "8767"))
+WHISPER_QUEUE_SIZE = int(os.environ.get("WHISPER_QUEUE_SIZE", "8"))
+WHISPER_BATCH_SIZE = int(os.environ.get("WHISPER_BATCH_SIZE", "8"))
+WHISPER_BATCH_WAIT_MS = int(os.environ.get("WHISPER_BATCH_WAIT_MS", "20"))
+WHISPER_BEAM_SIZE = int(os.environ.get("WHISPER_BEAM_SIZE", "1"))
+
+WHISPER_SAMPLE_RATE = 16000  # Whisper's native input rate
+
+# Whisper's encoder window; longer clips can't be one batch item
+BATCH_MAX_CLIP_S = 30
+
+# Peak amplitude (float32, full scale = 1.0) below which a clip is treated as silence
+SILENCE_PEAK = 1e-3
+
+ALLOWED_MODELS = {"distil-small.en", "distil-medium.en", "distil-large-v3", "base", "small", "tiny"}
+ALLOWED_COMPUTE = {"auto", "int8", "int8_float16", "int8_float32", "float16", "float32"}
 
-ALLOWED_MODELS = {"distil-large-v3", "base"}
+# Tried in order after the requested type; int8 variants halve VRAM vs float16
+COMPUTE_FALLBACKS = ["int8_float16", "int8", "float16"]
 
-# Global model state
-_model = None
-_model_name = None
+WAVE_FORMAT_PCM = 1
+
+# Pre-quantized models written by prepare_model.py
+MODELS_DIR = Path(__file__).parent / "models"
+# Which prepared quantization to load when WHISPER_COMPUTE=auto; int8 first
+PREPARED_COMPUTE_ORDER = ["int8_float16", "int8", "int8_float32", "float16", "float32"]
+
+KERNEL_CACHE_ROOT = Path.home() / ".cache/omarchy-voice-typing/cuda"
+KERNEL_CACHE_MAX_BYTES = 2 * 1024**3
+
+# Global model state. Always replaced with a new dict, never mutated, so
+# readers take a consistent snapshot (`state = _state`) without locking.
+_state = {"model": None, "pipeline": None, "name": None, "compute": None, "status": "loading"}
+# Serialises writers of _state; readers never take it
 _model_lock = threading.Lock()
-_status = "loading"
+# Serialises GPU work so a model is never unloaded mid-inference
+_gpu_lock = threading.Lock()
+
+_kernel_cache_warm = False
+
+# Pending ((audio, duration), Future) jobs for the inference worker
+_jobs: queue.Queue = queue.Queue(maxsize=WHISPER_QUEUE_SIZE)
+
+
+def get_gpu_memory_used_mb() -> int | None:
+    """Get used GPU memory via nvidia-smi (includes other processes)."""
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=memory.used", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, timeout=5,
+        )
+        if result.returncode == 0:
+            return int(result.stdout.strip().splitlines()[0])
+    except (subprocess.TimeoutExpired, FileNotFoundError, IndexError, ValueError):
+        pass
+    return None
+
+
+def configure_kernel_cache() -> Path:
+    """Persist CUDA JIT-compiled kernels across restarts.
+
+    Must run before CUDA is initialised (i.e. before the first WhisperModel).
+    The cache directory is keyed by GPU compute capability and CTranslate2
+    version so kernels built for a different GPU or build are never reused.
+    """
+    global _kernel_cache_warm
+    try:
+        result = subprocess.run(
+            ["nvidia-smi", "--query-gpu=compute_cap", "--format=csv,noheader"],
+            capture_output=True, text=True, timeout=5,
+        )
+        # On failure nvidia-smi prints its error message to stdout
+        first_line = result.stdout.strip().splitlines()[0] if result.returncode == 0 else ""
+        match = re.fullmatch(r"(\d+)\.(\d+)", first_line)
+        capability = match[1] + match[2] if match else "unknown"
+    except (subprocess.TimeoutExpired, FileNotFoundError, IndexError):
+        capability = "unknown"
+    try:
+        ct2_version = version("ctranslate2")
+    except PackageNotFoundError:
+        ct2_version = "unknown"
+
+    cache_dir = KERNEL_CACHE_ROOT / f"sm{capability}-ct2-{ct2_version}"
+    cache_dir = Path(os.environ.setdefault("CUDA_CACHE_PATH", str(cache_dir)))
+    os.environ.setdefault("CUDA_CACHE_MAXSIZE", str(KERNEL_CACHE_MAX_BYTES))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _kernel_cache_warm = any(cache_dir.iterdir())
+    return cache_dir
+
+
+def resolve_model_path(model_name: str, compute_type: str) -> str:
+    """Prefer a pre-quantized model from prepare_model.py over the HF hub.
+
+    Looks for models/<name>-<compute>/; with compute "auto", takes the first
+    prepared quantization in PREPARED_COMPUTE_ORDER. Otherwise returns the
+    model name.
+    """
+    candidates = PREPARED_COMPUTE_ORDER if compute_type == "auto" else [compute_type]
+    for compute in candidates:
+        prepared = MODELS_DIR / f"{model_name}-{compute}"
+        if prepared.is_dir():
+            return str(prepared)
+    return model_name
 
 
 def load_model(model_name: str, compute_type: str) -> None:
-    """Load a faster-whisper model into GPU memory."""
-    global _model, _model_name, _status
-    from faster_whisper import WhisperModel
+    """Load a faster-whisper model into GPU memory.
+
+    Tries the requested compute type first, then falls back through
+    COMPUTE_FALLBACKS (e.g. float16 is unsupported on Pascal GPUs).
+    """
+    global _state
 
-    _status = "loading"
+    with _model_lock:
+        _state = {**_state, "status": "loading"}
     print(f"[whisper] Loading model '{model_name}' (compute={compute_type})...")
     t0 = time.perf_counter()
 
-    new_model = WhisperModel(model_name, device="cuda", compute_type=compute_type)
+    new_model = None
+    for compute in dict.fromkeys([compute_type] + COMPUTE_FALLBACKS):
+        model_path = resolve_model_path(model_name, compute)
+        if model_path != model_name:
+            print(f"[whisper] Using pre-quantized model at {model_path}")
+        try:
+            new_model = WhisperModel(model_path, device="cuda", compute_type=compute)
+            break
+        except Exception as e:
+            print(f"[whisper] compute={compute} failed: {e}")
+
+    if new_model is None:
+        print(f"[whisper] Could not load model '{model_name}' with any compute type")
+        with _model_lock:
+            _state = {**_state, "status": "ready" if _state["model"] is not None else "error"}
+        return
+
+    # "auto" resolves to a concrete type inside CTranslate2
+    resolved_compute = new_model.model.compute_type
 
     elapsed = time.perf_counter() - t0
-    print(f"[whisper] Model '{model_name}' loaded in {elapsed:.1f}s")
+    print(f"[whisper] Model '{model_name}' loaded in {elapsed:.1f}s (compute={resolved_compute})")
+    vram_mb = get_gpu_memory_used_mb()
+    if vram_mb is not None:
+        print(f"[whisper] GPU memory used after load: {vram_mb}MB")
 
     with _model_lock:
-        _model = new_model
-        _model_name = model_name
-        _status = "ready"
-
-
-def transcribe_wav(wav_bytes: bytes) -> dict:
-    """Transcribe WAV audio bytes using the loaded model."""
+        _state = {
+            "model": new_model,
+            "pipeline": BatchedInferencePipeline(model=new_model),
+            "name": model_name,
+            "compute": resolved_compute,
+            "status": "ready",
+        }
+
+
+def release_model() -> int | None:
+    """Unload the current model from VRAM before a replacement is loaded.
+
+    Avoids holding two models at once on a 2GB card. Waits for any in-flight
+    inference to finish. Returns the MB freed according to nvidia-smi, or
+    None if that can't be measured.
+    """
+    global _state
+    before_mb = get_gpu_memory_used_mb()
+    with _gpu_lock:
+        with _model_lock:
+            old = _state["model"]
+            # Drop name/compute too: if the replacement fails to load, /health
+            # and /switch must not report the old model as still loaded
+            _state = {"model": None, "pipeline": None, "name": None, "compute": None, "status": "loading"}
+        if old is None:
+            return 0
+        # Frees the weights and CTranslate2's cached CUDA blocks
+        old.model.unload_model()
+        del old
+        gc.collect()
+    after_mb = get_gpu_memory_used_mb()
+    if before_mb is None or after_mb is None:
+        return None
+    return before_mb - after_mb
+
+
+def begin_switch() -> bool:
+    """Mark the model as loading unless a load is already in progress.
+
+    Check-and-set under _model_lock, so concurrent /switch requests can't
+    start two loads at once. Returns False if a load is already running.
+    """
+    global _state
     with _model_lock:
-        if _model is None:
-            return {"error": "model not loaded"}
-        model = _model
-        model_name = _model_name
+        if _state["status"] == "loading":
+            return False
+        _state = {**_state, "status": "loading"}
+    return True
+
+
+def switch_model(model_name: str, compute_type: str) -> None:
+    """Background half of /switch: unload the current model, then load the new one."""
+    freed_mb = release_model()
+    if freed_mb is not None:
+        print(f"[whisper] Released previous model ({freed_mb}MB VRAM freed)")
+    load_model(model_name, compute_type)
+
+
+def parse_wav_zero_copy(wav_bytes: bytes | bytearray | mmap.mmap) -> tuple[memoryview, int, int, int]:
+    """Locate the PCM payload of a WAV file without copying it.
+
+    Walks the RIFF chunks with struct.unpack_from and returns
+    (frames, sample_rate, n_channels, sample_width), where frames is a
+    memoryview into wav_bytes. Non-PCM layouts (e.g. WAVE_FORMAT_EXTENSIBLE)
+    fall back to the wave module. Raises wave.Error if the input isn't WAV
+    or its header is truncated or invalid.
+    """
+    if len(wav_bytes) < 12 or wav_bytes[0:4] != b"RIFF" or wav_bytes[8:12] != b"WAVE":
+        raise wave.Error("not a RIFF/WAVE file")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(wav_bytes):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", wav_bytes, offset)
+        body = offset + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            if body + 16 > len(wav_bytes):
+                raise wave.Error("truncated fmt chunk")
+            fmt = struct.unpack_from("<HHIIHH", wav_bytes, body)
+        elif chunk_id == b"data":
+            if fmt is None or fmt[0] != WAVE_FORMAT_PCM:
+                break
+            _, n_channels, sample_rate, _, block_align, bits = fmt
+            if not n_channels or not sample_rate:
+                raise wave.Error(f"bad fmt chunk: {n_channels} channels at {sample_rate}Hz")
+            # Streaming writers may leave the size unset; clamp to what arrived
+            end = min(body + chunk_size, len(wav_bytes))
+            if block_align:
+                end -= (end - body) % block_align
+            return memoryview(wav_bytes)[body:end], sample_rate, n_channels, bits // 8
+        # Chunks are word-aligned
+        offset = body + chunk_size + (chunk_size & 1)
 
-    # Parse WAV to get raw audio for faster-whisper
-    # faster-whisper accepts file paths or numpy arrays
-    import numpy as np
-
-    buf = io.BytesIO(wav_bytes)
     try:
-        with wave.open(buf, "rb") as wf:
-            sample_rate = wf.getframerate()
-            n_channels = wf.getnchannels()
-            sample_width = wf.getsampwidth()
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
             frames = wf.readframes(wf.getnframes())
-    except wave.Error:
-        # If not valid WAV, try treating as raw PCM16 24kHz mono
+            sample_rate, n_channels, sample_width = wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+    except (EOFError, struct.error) as e:
+        # wave lets truncated headers escape as these instead of wave.Error
+        raise wave.Error(f"truncated WAV header: {e}") from e
+    if not n_channels or not sample_rate:
+        raise wave.Error(f"bad fmt chunk: {n_channels} channels at {sample_rate}Hz")
+    return memoryview(frames), sample_rate, n_channels, sample_width
+
+
+def decode_wav(wav_bytes: bytes | bytearray | mmap.mmap) -> tuple[np.ndarray, float]:
+    """Decode a WAV body (or raw PCM16 24kHz mono) for faster-whisper.
+
+    Returns (audio, duration) where audio is 16kHz mono float32 and duration
+    is in seconds. Raises ValueError for a RIFF body with a broken header or
+    samples that aren't 16-bit.
+    """
+    try:
+        frames, sample_rate, n_channels, sample_width = parse_wav_zero_copy(wav_bytes)
+    except wave.Error as e:
+        if wav_bytes[0:4] == b"RIFF":
+            raise ValueError(f"malformed WAV: {e}") from e
+        # If not WAV at all, try treating as raw PCM16 24kHz mono
         frames = wav_bytes
         sample_rate = 24000
         n_channels = 1
         sample_width = 2
-
-    # Convert to float32 numpy array (what faster-whisper expects)
-    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
-    if n_channels > 1:
+    if sample_width != 2:
+        raise ValueError(f"unsupported sample width {sample_width * 8}-bit")
+
+    pcm = np.frombuffer(frames, dtype=np.int16)
+    if n_channels == 2:
+        # Downmix in integer space so only the mono half is cast to float
+        stereo = pcm.reshape(-1, 2)
+        pcm = (stereo[:, 0].astype(np.int32) + stereo[:, 1]) >> 1
+
+    # Convert to float32 numpy array (what faster-whisper expects).
+    # np.multiply with dtype fuses the int->float32 cast and scale into one pass.
+    audio = np.multiply(pcm, np.float32(1.0 / 32768.0), dtype=np.float32)
+    if n_channels > 2:
         audio = audio.reshape(-1, n_channels).mean(axis=1)
 
     audio_duration = len(audio) / sample_rate
 
+    # faster-whisper treats numpy input as already 16kHz (it only resamples
+    # when decoding files), so the gateway's 24kHz PCM must be resampled here.
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        audio = resample_poly(audio, WHISPER_SAMPLE_RATE, sample_rate).astype(np.float32, copy=False)
+
+    return audio, audio_duration
+
+
+def transcribe_audio(state: dict, audio: np.ndarray, audio_duration: float) -> dict:
+    """Transcribe one decoded clip with the model in the given state snapshot."""
     t0 = time.perf_counter()
-    segments, info = model.transcribe(audio, beam_size=5)
+    # Greedy decoding is several times faster than beam search on short clips;
+    # faster-whisper retries at higher temperatures if the output degenerates.
+    segments, info = state["model"].transcribe(
+        audio,
+        beam_size=WHISPER_BEAM_SIZE,
+        temperature=[0.0, 0.2, 0.4],
+        compression_ratio_threshold=2.4,
+        no_speech_threshold=0.6,
+        # Silero VAD drops non-speech; fully silent input never reaches the decoder
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=300, threshold=0.5),
+    )
     text_parts = [seg.text for seg in segments]
     elapsed = time.perf_counter() - t0
 
@@ -119,25 +393,147 @@ def transcribe_wav(wav_bytes: bytes) -> dict:
         "text": full_text,
         "duration": round(audio_duration, 2),
         "transcribe_time": round(elapsed, 2),
-        "model": model_name,
+        "model": state["name"],
         "language": info.language,
+        "beam_size": WHISPER_BEAM_SIZE,
+        "batched": 1,
     }
 
 
+def transcribe_batch(decoded: list[tuple[np.ndarray, float]]) -> list[dict]:
+    """Transcribe decoded clips, sharing encoder/decoder passes between them.
+
+    Clips up to 30s are concatenated and handed to BatchedInferencePipeline
+    with one clip_timestamps span per request, so each request becomes one
+    chunk of the batch. Segments are mapped back to requests by start time.
+    A lone clip, or one longer than 30s, is transcribed on its own.
+
+    Every result carries "batched": the number of requests that shared its
+    model pass (1 when transcribed alone). For batched results,
+    transcribe_time is the wall time of the whole batch, not of that clip.
+    """
+    # One snapshot per batch: a concurrent /switch publishes a new _state
+    # and never touches this one.
+    state = _state
+    if state["status"] != "ready":
+        return [{"error": "model not ready", "status": state["status"]} for _ in decoded]
+
+    results = [None] * len(decoded)
+    batched = [i for i, (audio, _) in enumerate(decoded)
+               if len(audio) <= BATCH_MAX_CLIP_S * WHISPER_SAMPLE_RATE]
+    if len(batched) < 2:
+        batched = []
+
+    for i, (audio, audio_duration) in enumerate(decoded):
+        if i not in batched:
+            results[i] = transcribe_audio(state, audio, audio_duration)
+    if not batched:
+        return results
+
+    clips = []
+    offset = 0
+    for i in batched:
+        n = len(decoded[i][0])
+        clips.append({"start": offset / WHISPER_SAMPLE_RATE, "end": (offset + n) / WHISPER_SAMPLE_RATE})
+        offset += n
+    audio = np.concatenate([decoded[i][0] for i in batched])
+
+    t0 = time.perf_counter()
+    # VAD is skipped here: the pipeline ignores vad_filter when clip_timestamps
+    # are given, and silent clips never reach the queue (see _send_transcription).
+    segments, info = state["pipeline"].transcribe(
+        audio,
+        clip_timestamps=clips,
+        batch_size=WHISPER_BATCH_SIZE,
+        beam_size=WHISPER_BEAM_SIZE,
+        without_timestamps=True,
+        multilingual=state["model"].model.is_multilingual,
+    )
+    starts = [clip["start"] for clip in clips]
+    text_parts = [[] for _ in batched]
+    for seg in segments:
+        # Segment starts are rounded to 1ms; nudge so they land in their own clip
+        text_parts[bisect.bisect_right(starts, seg.start + 1e-3) - 1].append(seg.text)
+    elapsed = time.perf_counter() - t0
+
+    for parts, i in zip(text_parts, batched):
+        results[i] = {
+            "text": " ".join(parts).strip(),
+            "duration": round(decoded[i][1], 2),
+            "transcribe_time": round(elapsed, 2),
+            "model": state["name"],
+            "language": info.language,
+            "beam_size": WHISPER_BEAM_SIZE,
+            "batched": len(batched),
+        }
+    return results
+
+
+def inference_worker():
+    """Run queued transcriptions on the GPU, batching requests that arrive together.
+
+    After taking a job, waits up to WHISPER_BATCH_WAIT_MS for more (at most
+    WHISPER_BATCH_SIZE in total) so concurrent callers share one batch.
+    """
+    while True:
+        jobs = [_jobs.get()]
+        deadline = time.monotonic() + WHISPER_BATCH_WAIT_MS / 1000
+        while len(jobs) < WHISPER_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                jobs.append(_jobs.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        jobs = [(clip, future) for clip, future in jobs
+                if future.set_running_or_notify_cancel()]
+        if not jobs:
+            continue
+        try:
+            with _gpu_lock:
+                results = transcribe_batch([clip for clip, _ in jobs])
+        except Exception as e:
+            for _, future in jobs:
+                future.set_exception(e)
+            continue
+        for (_, future), result in zip(jobs, results):
+            future.set_result(result)
+
+
+def submit_transcription(audio: np.ndarray, audio_duration: float) -> Future:
+    """Queue a decoded clip for the inference worker.
+
+    Raises queue.Full if WHISPER_QUEUE_SIZE jobs are already pending.
+    """
+    future = Future()
+    _jobs.put_nowait(((audio, audio_duration), future))
+    return future
+
+
 class WhisperHandler(BaseHTTPRequestHandler):
+    # Keep-alive lets the gateway reuse one TCP connection across shortcuts
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are dropped after this many seconds
+    timeout = 120
+
     def do_GET(self):
         parsed = urlparse(self.path)
 
         if parsed.path == "/health":
+            state = _state
             self._send_json({
-                "status": _status,
-                "model": _model_name or WHISPER_MODEL,
+                "status": state["status"],
+                "model": state["name"] or WHISPER_MODEL,
+                "compute": state["compute"] or WHISPER_COMPUTE,
             })
             return
 
         if parsed.path == "/switch":
             params = parse_qs(parsed.query)
             new_model = params.get("model", [None])[0]
+            compute = params.get("compute", [WHISPER_COMPUTE])[0]
             if not new_model:
                 self._send_json({"error": "missing ?model= parameter"}, 400)
                 return
@@ -147,50 +543,194 @@ class WhisperHandler(BaseHTTPRequestHandler):
                     "allowed": sorted(ALLOWED_MODELS),
                 }, 400)
                 return
-            if new_model == _model_name:
+            if compute not in ALLOWED_COMPUTE:
+                self._send_json({
+                    "error": f"unknown compute type: {compute}",
+                    "allowed": sorted(ALLOWED_COMPUTE),
+                }, 400)
+                return
+            state = _state
+            if state["status"] == "ready" and new_model == state["name"] and "compute" not in params:
                 self._send_json({"status": "already_loaded", "model": new_model})
                 return
 
-            # Load in background to not block the HTTP response
+            if not begin_switch():
+                self._send_json({"error": "a model is already loading", "status": "loading"}, 409)
+                return
+
+            # Release the old model and load the new one in background to not
+            # block the HTTP response (release waits for in-flight inference)
             threading.Thread(
-                target=load_model,
-                args=(new_model, WHISPER_COMPUTE),
+                target=switch_model,
+                args=(new_model, compute),
                 daemon=True,
             ).start()
-            self._send_json({"status": "switching", "model": new_model})
+            self._send_json({
+                "status": "switching",
+                "model": new_model,
+                "compute": compute,
+            })
             return
 
         self._send_json({"error": "not found"}, 404)
 
     def do_POST(self):
-        if self.path != "/transcribe":
+        # Error responses sent before the body is read must close the
+        # connection, or the unread body would be parsed as the next request.
+        if self.path not in ("/transcribe", "/transcribe_path"):
+            self.close_connection = True
             self._send_json({"error": "not found"}, 404)
             return
 
-        if _status != "ready":
-            self._send_json({"error": "model not ready", "status": _status}, 503)
+        status = _state["status"]
+        if status != "ready":
+            self.close_connection = True
+            self._send_json({"error": "model not ready", "status": status}, 503)
             return
 
-        content_length = int(self.headers.get("Content-Length", 0))
+        if self.path == "/transcribe_path":
+            self._transcribe_path()
+            return
+
+        content_length = self._content_length()
+        if content_length is None:
+            return
         if content_length == 0:
+            # No Content-Length (e.g. a chunked upload) leaves the body unread
+            self.close_connection = True
             self._send_json({"error": "empty body"}, 400)
             return
 
-        wav_data = self.rfile.read(content_length)
-        result = transcribe_wav(wav_data)
+        wav_data = self._read_body(content_length)
+        if wav_data is None:
+            self.close_connection = True
+            self._send_json({"error": "truncated body"}, 400)
+            return
+
+        self._send_transcription(wav_data)
+
+    def _transcribe_path(self):
+        """Transcribe a WAV file already on this machine by mmap-ing it (no upload copy)."""
+        if self.client_address[0] not in ("127.0.0.1", "::1"):
+            self.close_connection = True
+            self._send_json({"error": "/transcribe_path is only available to local clients"}, 403)
+            return
+
+        content_length = self._content_length()
+        if content_length is None:
+            return
+        body = self._read_body(content_length) if content_length else None
+        if body is None:
+            # Missing (e.g. chunked) or truncated body: nothing after it can be parsed
+            self.close_connection = True
+            self._send_json({"error": 'expected JSON body {"path": "..."}'}, 400)
+            return
+        try:
+            path = json.loads(body)["path"]
+        except (TypeError, ValueError, KeyError):
+            path = None
+        # open() treats an int as a file descriptor (and would close it)
+        if not isinstance(path, str) or not path:
+            self._send_json({"error": 'expected JSON body {"path": "..."}'}, 400)
+            return
+
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+        except (OSError, ValueError) as e:
+            # ValueError: empty file (mmap can't map zero bytes)
+            print(f"[whisper] /transcribe_path cannot read {path}: {e}")
+            self._send_json({"error": "cannot read file"}, 400)
+            return
+
+        try:
+            self._send_transcription(mm)
+        finally:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # still referenced by an exception traceback; unmapped when that's freed
+
+    def _send_transcription(self, wav_data: bytes | bytearray | mmap.mmap):
+        """Decode audio, queue it for the inference worker and send back its result.
+
+        Decoding (WAV parsing, PCM conversion, resampling) runs here on the
+        request thread, overlapping with whatever the GPU worker is doing.
+        """
+        try:
+            audio, audio_duration = decode_wav(wav_data)
+        except ValueError as e:
+            self._send_json({"error": f"invalid audio: {e}"}, 400)
+            return
+
+        # Accidental shortcut presses record near-digital silence; answer
+        # without queueing behind (or waking) the GPU worker
+        if len(audio) == 0 or np.abs(audio).max() < SILENCE_PEAK:
+            self._send_json({
+                "text": "",
+                "duration": round(audio_duration, 2),
+                "transcribe_time": 0.0,
+                "model": _state["name"] or WHISPER_MODEL,
+                "language": None,
+                "beam_size": WHISPER_BEAM_SIZE,
+                "batched": 1,
+            })
+            return
+
+        try:
+            future = submit_transcription(audio, audio_duration)
+        except queue.Full:
+            self._send_json({"error": "server busy", "queued": _jobs.qsize()}, 503)
+            return
+
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"[whisper] Transcription failed: {e}")
+            result = {"error": str(e)}
 
         if "error" in result:
             self._send_json(result, 500)
         else:
             self._send_json(result)
 
+    def _content_length(self) -> int | None:
+        """Parse Content-Length (0 if absent); on a bad value, send a 400 and return None."""
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self.close_connection = True
+            self._send_json({"error": "invalid Content-Length"}, 400)
+            return None
+        return content_length
+
+    def _read_body(self, content_length: int) -> bytearray | None:
+        """Read the request body into a pre-sized buffer (no intermediate bytes objects)."""
+        buf = bytearray(content_length)
+        view = memoryview(buf)
+        offset = 0
+        while offset < content_length:
+            n = self.rfile.readinto(view[offset:])
+            if not n:
+                return None
+            offset += n
+        return buf
+
     def _send_json(self, data: dict, status: int = 200):
-        body = json.dumps(data).encode()
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        body = json.dumps(data, separators=(",", ":")).encode()
+        connection = "close" if self.close_connection else "keep-alive"
+        # Status line, headers and body go out in a single write (one sendall)
+        head = (
+            f"{self.protocol_version} {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {connection}\r\n"
+            "\r\n"
+        ).encode()
+        self.log_request(status)
+        self.wfile.write(head + body)
 
     def log_message(self, format, *args):
         print(f"[whisper-http] {args[0]}")
@@ -198,26 +738,33 @@ class WhisperHandler(BaseHTTPRequestHandler):
 
 def warmup_model():
     """Warmup: transcribe 1s of silence to JIT-compile CUDA kernels."""
-    import numpy as np
-    global _status
-    while _status != "ready":
+    while _state["status"] != "ready":
         time.sleep(0.5)
     print("[whisper] Warming up model (JIT kernel compilation)...")
     t0 = time.perf_counter()
-    silence = np.zeros(16000, dtype=np.float32)  # 1s at 16kHz
-    with _model_lock:
-        segments, _ = _model.transcribe(silence, beam_size=5)
+    with _gpu_lock:
+        model = _state["model"]
+        if model is None:  # released by a /switch before warmup started
+            return
+        silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)  # 1s
+        # Same VAD path as transcribe_audio, so Silero is loaded here too
+        segments, _ = model.transcribe(silence, beam_size=WHISPER_BEAM_SIZE, vad_filter=True)
         _ = list(segments)  # force evaluation
-    print(f"[whisper] Warmup complete in {time.perf_counter() - t0:.1f}s")
+    cache = "hit" if _kernel_cache_warm else "miss"
+    print(f"[whisper] Warmup complete in {time.perf_counter() - t0:.1f}s (kernel cache {cache})")
 
 
 def main():
+    cache_dir = configure_kernel_cache()
+    print(f"[whisper] CUDA kernel cache: {cache_dir}")
+
     # Load model in background so server starts accepting connections immediately
     threading.Thread(target=load_model, args=(WHISPER_MODEL, WHISPER_COMPUTE), daemon=True).start()
     # Warmup after model loads to JIT-compile CUDA kernels
     threading.Thread(target=warmup_model, daemon=True).start()
+    threading.Thread(target=inference_worker, daemon=True).start()
 
-    server = HTTPServer(("0.0.0.0", WHISPER_PORT), WhisperHandler)
+    server = ThreadingHTTPServer(("0.0.0.0", WHISPER_PORT), WhisperHandler)
     print(f"[whisper] Server listening on :{WHISPER_PORT}")
     print(f"[whisper] Model: {WHISPER_MODEL}, Compute: {WHISPER_COMPUTE}")
     try:
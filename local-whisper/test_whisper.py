@@ -54,14 +54,15 @@ def get_gpu_info():
 
 
 def transcribe(audio_path: str, model_size: str = "small",
-               force_device: str = None, force_compute: str = None):
+               force_device: str = None, force_compute: str = None,
+               beam_size: int = 1):
     """Run transcription and return results with timing."""
     from faster_whisper import WhisperModel
 
     gpu_before = get_gpu_info()
 
     print(f"\n{'='*60}")
-    print(f"Model: {model_size}")
+    print(f"Model: {model_size} (beam_size={beam_size})")
     print(f"Audio: {audio_path}")
     if force_device:
         print(f"Forced: {force_device}/{force_compute}")
@@ -80,8 +81,9 @@ def transcribe(audio_path: str, model_size: str = "small",
             print(f"  {force_device}/{force_compute} failed: {e}")
             return {"model": model_size, "error": str(e)}
     else:
-        # Auto-detect: try CUDA with different compute types, fall back to CPU
-        for device, compute in [("cuda", "float16"), ("cuda", "float32"), ("cuda", "int8"), ("cpu", "int8")]:
+        # Auto-detect: let CTranslate2 pick for CUDA, then try int8 variants, fall back to CPU
+        for device, compute in [("cuda", "auto"), ("cuda", "int8_float16"), ("cuda", "int8"),
+                                ("cuda", "float16"), ("cpu", "int8")]:
             try:
                 model = WhisperModel(model_size, device=device, compute_type=compute)
                 device_used = f"{device}/{compute}"
@@ -98,7 +100,8 @@ def transcribe(audio_path: str, model_size: str = "small",
     # Transcribe
     print("Transcribing...")
     t1 = time.perf_counter()
-    segments, info = model.transcribe(audio_path, beam_size=5)
+    segments, info = model.transcribe(audio_path, beam_size=beam_size,
+                                      temperature=[0.0, 0.2, 0.4])
     text_parts = []
     for segment in segments:
         text_parts.append(segment.text)
@@ -147,8 +150,10 @@ def main():
                         help="Whisper model size (default: small). Options: tiny, base, small, medium, large-v3, distil-small.en, distil-medium.en, distil-large-v3")
     parser.add_argument("--device", choices=["cuda", "cpu"],
                         help="Force device (default: auto-detect)")
-    parser.add_argument("--compute", choices=["float16", "float32", "int8", "int8_float32"],
+    parser.add_argument("--compute", choices=["auto", "float16", "float32", "int8", "int8_float16", "int8_float32"],
                         help="Force compute type (default: auto-detect)")
+    parser.add_argument("--beam-size", type=int, default=1,
+                        help="Decoder beam size (default: 1, greedy)")
     parser.add_argument("--compare", action="store_true",
                         help="Compare tiny, base, and small models")
     parser.add_argument("--compare-compute", action="store_true",
@@ -182,7 +187,8 @@ def main():
             label = f"{device}/{compute}"
             try:
                 r = transcribe(str(audio), args.model,
-                               force_device=device, force_compute=compute)
+                               force_device=device, force_compute=compute,
+                               beam_size=args.beam_size)
                 r["label"] = label
                 results.append(r)
             except Exception as e:
@@ -206,7 +212,8 @@ def main():
         for size in ["tiny", "base", "small"]:
             try:
                 r = transcribe(str(audio), size,
-                               force_device=args.device, force_compute=args.compute)
+                               force_device=args.device, force_compute=args.compute,
+                               beam_size=args.beam_size)
                 results.append(r)
             except Exception as e:
                 print(f"Error with {size}: {e}")
@@ -225,7 +232,8 @@ def main():
                 print(f"{r['model']:<8} {r['load_time']:<9.2f} {r['transcribe_time']:<10.2f} {r['rtf']:<6.2f} {vram:<10}")
     else:
         transcribe(str(audio), args.model,
-                   force_device=args.device, force_compute=args.compute)
+                   force_device=args.device, force_compute=args.compute,
+                   beam_size=args.beam_size)
 
 
 if __name__ == "__main__":